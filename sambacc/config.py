@@ -17,32 +17,46 @@
 #
 
 import binascii
+import contextlib
 import errno
-import json
+import mmap
+import os
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 
 _VALID_VERSIONS = ["v0"]
 
+# files smaller than this are read directly, the map setup is not worth it
+_MMAP_MIN_SIZE = 4096
+# orjson parses from a memoryview, the stdlib json module needs bytes
+_MMAP_OK = _json.__name__ == "orjson"
+
 # alias open to _open to support test assertions when running
 # as UID 0
 _open = open
 
 
-def read_config_files(fnames):
+def read_config_files(fnames, identity=None):
     """Read the global container config from the given filenames.
     At least one of the files from the fnames list must exist and contain
     a valid config. If none of the file names exist an error will be raised.
+    If identity is given only the instance config for that identity is
+    retained.
     """
     # NOTE: Right now if more than one config exists they'll be "merged" but
     # the merging is very simplistic right now. Mainly we expect that the
     # users will be split from the main config (for security reasons) but
     # it would be nicer to have a good merge algorithm handle everything
     # smarter at some point.
-    gconfig = GlobalConfig()
+    gconfig = GlobalConfig(identity=identity)
     readfiles = set()
     for fname in fnames:
         try:
-            with _open(fname) as fh:
-                gconfig.load(fh)
+            with _open(fname, "rb") as fh, _file_data(fh) as data:
+                gconfig.loads(data)
             readfiles.add(fname)
         except OSError as err:
             if getattr(err, "errno", 0) != errno.ENOENT:
@@ -55,6 +69,32 @@ def read_config_files(fnames):
     return gconfig
 
 
+@contextlib.contextmanager
+def _file_data(fh):
+    """Yield the contents of the open (binary) file fh. Larger files are
+    memory mapped rather than copied onto the heap, when the parser
+    supports it.
+    """
+    if not _MMAP_OK or os.fstat(fh.fileno()).st_size < _MMAP_MIN_SIZE:
+        yield fh.read()
+        return
+    with mmap.mmap(fh.fileno(), 0, prot=mmap.PROT_READ) as mm:
+        with memoryview(mm) as buf:
+            yield buf
+
+
+def read_identity(fnames, identity):
+    """Read the config files and return the instance config for the given
+    identity. Raises a ValueError if no config exists for the identity.
+    """
+    # All files must still be read: the instance config may refer to
+    # shares, globals, or users that are defined in a later file.
+    gconfig = read_config_files(fnames, identity=identity)
+    if identity not in gconfig.data.get("configs", {}):
+        raise ValueError(f"No config found for identity: {identity}")
+    return gconfig.get(identity)
+
+
 def check_config_data(data):
     """Return the config data or raise a ValueError if the config
     is invalid or incomplete.
@@ -69,13 +109,26 @@ def check_config_data(data):
 
 
 class GlobalConfig:
-    def __init__(self, source=None):
+    def __init__(self, source=None, identity=None):
         self.data = {}
+        self.identity = identity
         if source is not None:
             self.load(source)
 
     def load(self, source):
-        data = check_config_data(json.load(source))
+        self.loads(source.read())
+
+    def loads(self, data):
+        # both orjson and json accept bytes as well as str
+        data = check_config_data(_json.loads(data))
+        if self.identity is not None and "configs" in data:
+            # drop the instance configs we were not asked for
+            configs = data["configs"]
+            data["configs"] = (
+                {self.identity: configs[self.identity]}
+                if self.identity in configs
+                else {}
+            )
         self.data.update(data)
 
     def get(self, ident):
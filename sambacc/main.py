@@ -17,36 +17,93 @@
 #
 
 import argparse
+import functools
+import io
+import itertools
 import os
 import sys
 import time
 
 import sambacc.config as config
 import sambacc.netcmd_loader as nc
-import sambacc.nsswitch_loader as nsswitch
-import sambacc.passdb_loader as passdb
-import sambacc.passwd_loader as ugl
-import sambacc.paths as paths
+
+# The remaining sambacc modules are only needed by some of the commands and
+# are imported by the functions that use them, keeping start up of the other
+# commands short.
 
 DEFAULT_CONFIG = "/etc/samba/container/config.json"
 
+# server commands are given by absolute path, no PATH search is needed
+_SMBD_ARGV = (
+    "/usr/sbin/smbd",
+    "--foreground",
+    "--log-stdout",
+    "--no-process-group",
+)
+_WINBINDD_ARGV = (
+    "/usr/sbin/winbindd",
+    "--foreground",
+    "--stdout",
+    "--no-process-group",
+)
+
+# parsed configs, keyed on the path, mtime, and size of each source file
+_CONFIG_CACHE = {}
+
 
 class Fail(ValueError):
     pass
 
 
+def _cache_key(cfgs):
+    key = []
+    for path in cfgs:
+        try:
+            st = os.stat(path)
+        except OSError:
+            key.append((os.path.abspath(path), None, None))
+        else:
+            key.append((os.path.abspath(path), st.st_mtime_ns, st.st_size))
+    return tuple(key)
+
+
+def _load(cfgs, identity):
+    """Read the instance config for identity from the config files,
+    reusing a previously parsed config if none of the files have changed
+    since they were last read.
+    """
+    key = (identity, _cache_key(cfgs))
+    try:
+        return _CONFIG_CACHE[key]
+    except KeyError:
+        pass
+    iconfig = config.read_identity(cfgs, identity)
+    _CONFIG_CACHE[key] = iconfig
+    return iconfig
+
+
 def print_config(cli, config):
     cfgs = cli.config or []
-    iconfig = config.read_config_files(cfgs).get(cli.identity)
-    nc.template_config(sys.stdout, iconfig)
+    iconfig = _load(cfgs, cli.identity)
+    # render the whole config first so it is emitted with a single write
+    buf = io.StringIO()
+    nc.template_config(buf, iconfig)
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
 
 
 def import_config(cli, config):
+    cfgs = cli.config or []
+    iconfig = _load(cfgs, cli.identity)
+    _import_config(iconfig)
+
+
+def _import_config(iconfig):
+    import sambacc.paths as paths
+
     # there are some expectations about what dirs exist and perms
     paths.ensure_samba_dirs()
 
-    cfgs = cli.config or []
-    iconfig = config.read_config_files(cfgs).get(cli.identity)
     loader = nc.NetCmdLoader()
     loader.import_config(iconfig)
 
@@ -57,63 +114,70 @@ def import_users(cli, config):
     to log into the smbd instance.
     """
     cfgs = cli.config or []
-    iconfig = config.read_config_files(cfgs).get(cli.identity)
+    iconfig = _load(cfgs, cli.identity)
+    _import_users(cli, iconfig)
+
+
+def _import_users(cli, iconfig):
+    import sambacc.passdb_loader as passdb
+    import sambacc.passwd_loader as ugl
+
+    users = list(iconfig.users())
+    groups = list(iconfig.groups())
     etc_passwd_loader = ugl.PasswdFileLoader(cli.etc_passwd_path)
     etc_group_loader = ugl.GroupFileLoader(cli.etc_group_path)
     smb_passdb_loader = passdb.PassDBLoader()
 
-    etc_passwd_loader.read()
-    etc_group_loader.read()
-    for u in iconfig.users():
+    if _has_content(cli.etc_passwd_path):
+        etc_passwd_loader.read()
+    if _has_content(cli.etc_group_path):
+        etc_group_loader.read()
+    for u in users:
         etc_passwd_loader.add_user(u)
-    for g in iconfig.groups():
+    for g in groups:
         etc_group_loader.add_group(g)
     etc_passwd_loader.write()
     etc_group_loader.write()
 
-    for u in iconfig.users():
-        smb_passdb_loader.add_user(u)
+    smb_passdb_loader.add_users(users)
     return
 
 
+def _has_content(path):
+    try:
+        return os.stat(path).st_size > 0
+    except FileNotFoundError:
+        return False
+
+
 def init_container(cli, config):
     """Run all of the standard set-up actions."""
-    import_config(cli, config)
-    import_users(cli, config)
+    import sambacc.nsswitch_loader as nsswitch
+
+    cfgs = cli.config or []
+    iconfig = _load(cfgs, cli.identity)
+    _import_config(iconfig)
+    _import_users(cli, iconfig)
 
     # should nsswitch validation/edit be conditional only on ads?
-    nss = nsswitch.NameServiceSwitchLoader("/etc/nsswitch.conf")
-    nss.read()
-    if not nss.winbind_enabled():
-        nss.ensure_winbind_enabled()
-        nss.write()
+    nsswitch.ensure_winbind("/etc/nsswitch.conf")
 
 
 def run_container(cli, config):
     if not getattr(cli, "no_init", False):
         init_container(cli, config)
     else:
+        import sambacc.paths as paths
+
         paths.ensure_samba_dirs()
     if cli.target == "smbd":
         # execute smbd process
-        cmd = [
-            "/usr/sbin/smbd",
-            "--foreground",
-            "--log-stdout",
-            "--no-process-group",
-        ]
-        os.execvp(cmd[0], cmd)
+        os.execv(_SMBD_ARGV[0], _SMBD_ARGV)
     elif cli.target == "winbindd":
         if getattr(cli, "insecure_auto_join", False):
             join(cli, config)
         # execute winbind process
-        cmd = [
-            "/usr/sbin/winbindd",
-            "--foreground",
-            "--stdout",
-            "--no-process-group",
-        ]
-        os.execvp(cmd[0], cmd)
+        os.execv(_WINBINDD_ARGV[0], _WINBINDD_ARGV)
     else:
         raise Fail(f"invalid target process: {cli.target}")
 
@@ -133,9 +197,12 @@ default_cfunc = print_config
 
 
 def from_env(ns, var, ename, default=None, vtype=str):
-    value = getattr(ns, var, None)
+    """Set ns.var from the environment variable ename, or failing that
+    the default, if it was not already given on the command line.
+    """
+    value = getattr(ns, var, None) or os.environ.get(ename, "") or default
     if not value:
-        value = os.environ.get(ename, "")
+        return
     if vtype is not None:
         value = vtype(value)
     if value:
@@ -147,11 +214,7 @@ def split_paths(value):
         return value
     if not isinstance(value, list):
         value = [value]
-    out = []
-    for v in value:
-        for part in v.split(":"):
-            out.append(part)
-    return out
+    return list(itertools.chain.from_iterable(v.split(":") for v in value))
 
 
 def pre_action(cli):
@@ -162,7 +225,22 @@ def pre_action(cli):
         time.sleep(int(cli.debug_delay))
 
 
-def main(args=None):
+def _profile(path, cfunc, *args):
+    """Run cfunc under the profiler, saving the stats to path."""
+    import cProfile
+
+    prof = cProfile.Profile()
+    try:
+        prof.runcall(cfunc, *args)
+    finally:
+        prof.dump_stats(path)
+
+
+@functools.lru_cache(maxsize=1)
+def _build_parser():
+    """Construct the command line parser. The parser is built only once
+    and reused for subsequent calls.
+    """
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--config",
@@ -202,6 +280,13 @@ def main(args=None):
         type=int,
         help="Delay activity for a specified number of seconds.",
     )
+    parser.add_argument(
+        "--profile",
+        help=(
+            "Write cProfile stats for the command to the specified path"
+            " (not written if the command executes a server process)."
+        ),
+    )
     sub = parser.add_subparsers()
     p_print_config = sub.add_parser(
         "print-config",
@@ -261,7 +346,11 @@ def main(args=None):
         ),
     )
     p_join.set_defaults(cfunc=join)
-    cli = parser.parse_args(args)
+    return parser
+
+
+def main(args=None):
+    cli = _build_parser().parse_args(args)
     from_env(
         cli,
         "config",
@@ -278,7 +367,10 @@ def main(args=None):
 
     pre_action(cli)
     cfunc = getattr(cli, "cfunc", default_cfunc)
-    cfunc(cli, config)
+    if cli.profile:
+        _profile(cli.profile, cfunc, cli, config)
+    else:
+        cfunc(cli, config)
 
     return
 
@@ -62,3 +62,17 @@ class NameServiceSwitchLoader(TextFileLoader):
         gidx = self.idx["group"]
         if "winbind" not in self.lines[gidx]:
             self.lines[gidx] = "group:    files winbind\n"
+
+
+def ensure_winbind(path):
+    """Read the nsswitch file at path and enable winbind for the passwd
+    and group databases. The file is only rewritten if it was changed.
+    Returns true if the file was modified.
+    """
+    nss = NameServiceSwitchLoader(path)
+    nss.read()
+    if nss.winbind_enabled():
+        return False
+    nss.ensure_winbind_enabled()
+    nss.write()
+    return True
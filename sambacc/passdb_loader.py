@@ -41,11 +41,22 @@ class PassDBLoader:
         self._pdb = passdb.PDB(lp.get("passdb backend"))
         self._passdb = passdb
 
+    def add_users(self, user_entries):
+        """Add or update all of the given users in the passdb, sharing
+        one open passdb handle. Every entry is validated before any are
+        written.
+        """
+        user_entries = list(user_entries)
+        for user_entry in user_entries:
+            _check_passwd(user_entry)
+        for user_entry in user_entries:
+            self._add_user(user_entry)
+
     def add_user(self, user_entry):
-        if not (user_entry.nt_passwd or user_entry.plaintext_passwd):
-            raise ValueError(
-                f"user entry {user_entry.username} lacks password value"
-            )
+        _check_passwd(user_entry)
+        self._add_user(user_entry)
+
+    def _add_user(self, user_entry):
         # probe for an existing user, by name
         try:
             samu = self._pdb.getsampwnam(user_entry.username)
@@ -71,3 +82,10 @@ class PassDBLoader:
             samu.acct_ctrl = acb & ~ACB_DISABLED
         # update the db
         self._pdb.update_sam_account(samu)
+
+
+def _check_passwd(user_entry):
+    if not (user_entry.nt_passwd or user_entry.plaintext_passwd):
+        raise ValueError(
+            f"user entry {user_entry.username} lacks password value"
+        )
@@ -16,14 +16,38 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 #
 
+import os
+
 from .textfile import TextFileLoader
 
+# lines previously read from a file, keyed on path. Each entry records the
+# (inode, mtime, size) of the file when it was read so that changed files
+# are re-read.
+_FILE_CACHE = {}
+
 
 class LineFileLoader(TextFileLoader):
     def __init__(self, path):
         super().__init__(path)
         self.lines = []
 
+    def read(self):
+        key = os.fspath(self.path)
+        with open(self.path) as f:
+            st = os.fstat(f.fileno())
+            stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+            cached = _FILE_CACHE.get(key)
+            if cached is not None and cached[0] == stamp:
+                lines = cached[1]
+            else:
+                lines = f.readlines()
+                _FILE_CACHE[key] = (stamp, lines)
+        self.loadlines(lines)
+
+    def write(self):
+        super().write()
+        _FILE_CACHE.pop(os.fspath(self.path), None)
+
     def loadlines(self, lines):
         """Load in the lines from the text source.
         """
@@ -46,8 +70,8 @@ class PasswdFileLoader(LineFileLoader):
         super().__init__(path)
         self._usernames = set()
 
-    def readfp(self, fp):
-        super().readfp(fp)
+    def loadlines(self, lines):
+        super().loadlines(lines)
         self._update_usernames_cache()
 
     def _update_usernames_cache(self):
@@ -69,8 +93,8 @@ class GroupFileLoader(LineFileLoader):
         super().__init__(path)
         self._groupnames = set()
 
-    def readfp(self, fp):
-        super().readfp(fp)
+    def loadlines(self, lines):
+        super().loadlines(lines)
         self._update_groupnames_cache()
 
     def _update_groupnames_cache(self):
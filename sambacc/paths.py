@@ -19,6 +19,9 @@
 import errno
 import os
 
+# roots under which ensure_samba_dirs has already created the dirs
+_ENSURED_ROOTS = set()
+
 
 def ensure_samba_dirs(root="/"):
     """Ensure that certain directories that samba servers expect will
@@ -29,6 +32,9 @@ def ensure_samba_dirs(root="/"):
     smb_private_dir = os.path.join(smb_dir, "private")
     smb_run_dir = os.path.join(root, "run/samba")
     wb_sockets_dir = os.path.join(smb_run_dir, "winbindd")
+    if root in _ENSURED_ROOTS and os.path.isdir(wb_sockets_dir):
+        # already done by this process and the dirs still appear to exist
+        return
 
     _mkdir(smb_dir)
     _mkdir(smb_private_dir)
@@ -36,6 +42,7 @@ def ensure_samba_dirs(root="/"):
     _mkdir(smb_run_dir)
     _mkdir(wb_sockets_dir)
     os.chmod(wb_sockets_dir, 0o755)
+    _ENSURED_ROOTS.add(root)
 
 
 def _mkdir(path):
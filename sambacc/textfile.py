@@ -17,6 +17,9 @@
 #
 
 import os
+import tempfile
+
+_DEFAULT_MODE = 0o644
 
 
 class TextFileLoader:
@@ -28,14 +31,26 @@ class TextFileLoader:
             self.readfp(f)
 
     def write(self):
-        tpath = self._tmp_path(self.path)
-        with open(tpath, "w") as f:
-            self.writefp(f)
-        os.rename(tpath, self.path)
-
-    def _tmp_path(self, path):
-        # for later: make this smarter
-        return f"{path}.tmp"
+        """Atomically replace the file with the current content.
+        The content is written to a temporary file in the same dir with
+        one write call, synced, and then renamed over the original.
+        """
+        data = "".join(self.dumplines()).encode("utf8")
+        try:
+            mode = os.stat(self.path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = _DEFAULT_MODE
+        dirpath = os.path.dirname(os.fspath(self.path)) or "."
+        tf = tempfile.NamedTemporaryFile(dir=dirpath, delete=False)
+        try:
+            with tf:
+                _write_all(tf.fileno(), data)
+                os.fchmod(tf.fileno(), mode)
+                os.fsync(tf.fileno())
+            os.replace(tf.name, self.path)
+        except BaseException:
+            os.unlink(tf.name)
+            raise
 
     def readfp(self, fp):
         self.loadlines(fp.readlines())
@@ -44,3 +59,11 @@ class TextFileLoader:
         for line in self.dumplines():
             fp.write(line)
         fp.flush()
+
+
+def _write_all(fd, data):
+    # os.write may write less than requested, keep going until done
+    view = memoryview(data)
+    while view:
+        n = os.write(fd, view)
+        view = view[n:]
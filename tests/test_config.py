@@ -17,6 +17,7 @@
 #
 
 import io
+import json
 import os
 import pytest
 import unittest
@@ -339,10 +340,73 @@ def test_read_config_files_realerr(tmpdir):
 
 
 def test_tesd_config_files_realerr_rootok(monkeypatch):
-    def err_open(p):
+    def err_open(p, *args):
         raise OSError("test!")
 
     monkeypatch.setattr(sambacc.config, "_open", err_open)
     fname = "/etc/foobar"
     with pytest.raises(OSError):
         sambacc.config.read_config_files([fname])
+
+
+def test_read_config_files_identity(tmpdir):
+    data = json.loads(config1)
+    data["configs"]["other"] = dict(data["configs"]["foobar"])
+    fname = tmpdir / "sample.json"
+    with open(fname, "w") as fh:
+        json.dump(data, fh)
+    g = sambacc.config.read_config_files([fname], identity="foobar")
+    assert list(g.data["configs"]) == ["foobar"]
+    assert len(list(g.get("foobar").shares())) == 2
+    with pytest.raises(KeyError):
+        g.get("other")
+
+
+def test_read_config_files_large(tmpdir):
+    data = json.loads(config2)
+    data["_extra_junk"] = "x" * (2 * sambacc.config._MMAP_MIN_SIZE)
+    fname = tmpdir / "sample.json"
+    with open(fname, "w") as fh:
+        json.dump(data, fh)
+    g = sambacc.config.read_config_files([fname])
+    assert g.data["_extra_junk"] == data["_extra_junk"]
+    assert len(list(g.get("foobar").users())) == 3
+
+
+def test_read_identity(tmpdir):
+    fname = tmpdir / "sample.json"
+    with open(fname, "w") as fh:
+        fh.write(config2)
+    ic = sambacc.config.read_identity([fname], "foobar")
+    assert ("netbios name", "GANDOLPH") in list(ic.global_options())
+    with pytest.raises(ValueError):
+        sambacc.config.read_identity([fname], "nope")
+
+
+def test_read_config_files_identity_merge(tmpdir):
+    data = json.loads(config2)
+    users = {"samba-container-config": "v0", "users": data.pop("users")}
+    fname1 = tmpdir / "sample.json"
+    with open(fname1, "w") as fh:
+        json.dump(data, fh)
+    fname2 = tmpdir / "users.json"
+    with open(fname2, "w") as fh:
+        json.dump(users, fh)
+    # a later file without configs keeps the selected identity
+    g = sambacc.config.read_config_files([fname1, fname2], identity="foobar")
+    assert list(g.data["configs"]) == ["foobar"]
+    assert len(list(g.get("foobar").users())) == 3
+
+    # a later file with configs replaces the earlier configs, even if it
+    # does not contain the selected identity
+    other = {
+        "samba-container-config": "v0",
+        "configs": {"other": data["configs"]["foobar"]},
+    }
+    fname3 = tmpdir / "other.json"
+    with open(fname3, "w") as fh:
+        json.dump(other, fh)
+    g = sambacc.config.read_config_files([fname1, fname3], identity="foobar")
+    assert g.data["configs"] == {}
+    with pytest.raises(ValueError):
+        sambacc.config.read_identity([fname1, fname3], "foobar")
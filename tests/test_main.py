@@ -16,6 +16,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 #
 
+import argparse
+import pstats
 import pytest
 
 import sambacc.main
@@ -59,3 +61,74 @@ def test_print_config_env_vars(capsys, tmp_path, monkeypatch):
     assert "path = /share" in out
     assert "[stuff]" in out
     assert "path = /mnt/stuff" in out
+
+
+def test_config_cache(tmp_path, monkeypatch):
+    fname = tmp_path / "sample.json"
+    with open(fname, "w") as fh:
+        fh.write(config1)
+    monkeypatch.setattr(sambacc.main, "_CONFIG_CACHE", {})
+    ic1 = sambacc.main._load([str(fname)], "foobar")
+    ic2 = sambacc.main._load([str(fname)], "foobar")
+    assert ic1 is ic2
+    # rewriting the file with different content must not reuse the cache
+    with open(fname, "w") as fh:
+        fh.write(config1.replace("GANDOLPH", "GANDALF"))
+    ic3 = sambacc.main._load([str(fname)], "foobar")
+    assert ic3 is not ic1
+    assert ("netbios name", "GANDALF") in list(ic3.global_options())
+
+
+def test_split_paths():
+    assert sambacc.main.split_paths(None) is None
+    assert sambacc.main.split_paths("/a") == ["/a"]
+    assert sambacc.main.split_paths("/a:/b") == ["/a", "/b"]
+    assert sambacc.main.split_paths(["/a:/b", "/c"]) == ["/a", "/b", "/c"]
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv("SAMBACC_CONFIG", raising=False)
+    ns = argparse.Namespace(config=None)
+    sambacc.main.from_env(
+        ns, "config", "SAMBACC_CONFIG", vtype=sambacc.main.split_paths
+    )
+    assert ns.config is None
+    sambacc.main.from_env(
+        ns,
+        "config",
+        "SAMBACC_CONFIG",
+        vtype=sambacc.main.split_paths,
+        default="/etc/foo.json",
+    )
+    assert ns.config == ["/etc/foo.json"]
+
+    monkeypatch.setenv("SAMBACC_CONFIG", "/a.json:/b.json")
+    ns = argparse.Namespace(config=None)
+    sambacc.main.from_env(
+        ns,
+        "config",
+        "SAMBACC_CONFIG",
+        vtype=sambacc.main.split_paths,
+        default="/etc/foo.json",
+    )
+    assert ns.config == ["/a.json", "/b.json"]
+
+
+def test_print_config_profile(capsys, tmp_path):
+    fname = tmp_path / "sample.json"
+    with open(fname, "w") as fh:
+        fh.write(config1)
+    pname = tmp_path / "out.prof"
+    run(
+        "--identity",
+        "foobar",
+        "--config",
+        str(fname),
+        "--profile",
+        str(pname),
+        "print-config",
+    )
+    out, err = capsys.readouterr()
+    assert "[global]" in out
+    stats = pstats.Stats(str(pname))
+    assert stats.total_calls > 0
@@ -0,0 +1,60 @@
+#
+# sambacc: a samba container configuration tool
+# Copyright (C) 2021  John Mulligan
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+
+import os
+
+import sambacc.nsswitch_loader
+
+etc_nsswitch1 = """
+# Sample nsswitch.conf
+passwd:     files sss systemd
+shadow:     files sss
+group:      files sss systemd
+
+hosts:      files dns myhostname
+"""
+
+etc_nsswitch2 = """
+passwd:     files winbind
+group:      files winbind
+hosts:      files dns
+"""
+
+
+def test_ensure_winbind(tmp_path):
+    fname = tmp_path / "nsswitch.conf"
+    with open(fname, "w") as fh:
+        fh.write(etc_nsswitch1)
+    assert sambacc.nsswitch_loader.ensure_winbind(fname)
+    nss = sambacc.nsswitch_loader.NameServiceSwitchLoader(fname)
+    nss.read()
+    assert nss.winbind_enabled()
+    assert "hosts:      files dns myhostname\n" in nss.lines
+
+
+def test_ensure_winbind_unchanged(tmp_path):
+    fname = tmp_path / "nsswitch.conf"
+    with open(fname, "w") as fh:
+        fh.write(etc_nsswitch2)
+    before = os.stat(fname)
+    assert not sambacc.nsswitch_loader.ensure_winbind(fname)
+    after = os.stat(fname)
+    assert before.st_ino == after.st_ino
+    with open(fname) as fh:
+        assert fh.read() == etc_nsswitch2
@@ -111,3 +111,22 @@ def test_add_user_no_passwd(smb_conf):
     ubad = sambacc.config.UserEntry(None, urec, 0)
     with pytest.raises(ValueError):
         pdbl.add_user(ubad)
+
+
+def test_add_users_batch_no_passwd(smb_conf):
+    requires_passdb_modules()
+    pdbl = sambacc.passdb_loader.PassDBLoader(smbconf=str(smb_conf))
+
+    # the entry lacking a password must be rejected before any
+    # of the entries are added
+    ugood = sambacc.config.UserEntry(
+        None, dict(name="alice", uid=1010, gid=1010, password="ok"), 0
+    )
+    ubad = sambacc.config.UserEntry(None, dict(name="bob", uid=1011), 0)
+    with pytest.raises(ValueError):
+        pdbl.add_users([ugood, ubad])
+    try:
+        samu = pdbl._pdb.getsampwnam("alice")
+    except pdbl._passdb.error:
+        samu = None
+    assert samu is None
@@ -1,4 +1,8 @@
+import errno
 import io
+import os
+
+import pytest
 
 import sambacc.passwd_loader
 from .test_config import config2
@@ -152,3 +156,93 @@ def test_write_passwd_file(tmp_path):
     assert "\nalice:x:" in txt
     assert "\nbob:x:" in txt
     assert "\ncarol:x:" in txt
+
+
+def test_read_passwd_file_cached(tmp_path):
+    fname = tmp_path / "cached_etc_passwd"
+    with open(fname, "w") as fh:
+        fh.write(etc_passwd1)
+    pfl = sambacc.passwd_loader.PasswdFileLoader(fname)
+    pfl.read()
+    assert str(fname) in sambacc.passwd_loader._FILE_CACHE
+
+    pfl2 = sambacc.passwd_loader.PasswdFileLoader(fname)
+    pfl2.read()
+    assert pfl2.lines == pfl.lines
+    assert "root" in pfl2._usernames
+    # the cached lines must not be shared with the loader
+    pfl2.lines.append("extra:x:9999:9999::/:/bin/false\n")
+    assert len(pfl.lines) == 14
+
+    pfl2.write()
+    assert str(fname) not in sambacc.passwd_loader._FILE_CACHE
+    pfl3 = sambacc.passwd_loader.PasswdFileLoader(fname)
+    pfl3.read()
+    assert len(pfl3.lines) == 15
+
+
+def test_write_passwd_file_mode(tmp_path):
+    fname = tmp_path / "mode_etc_passwd"
+    with open(fname, "w") as fh:
+        fh.write(etc_passwd1)
+    os.chmod(fname, 0o640)
+    pfl = sambacc.passwd_loader.PasswdFileLoader(fname)
+    pfl.read()
+    pfl.write()
+    assert os.stat(fname).st_mode & 0o777 == 0o640
+    # only the replaced file should remain
+    assert os.listdir(tmp_path) == ["mode_etc_passwd"]
+
+    fname2 = tmp_path / "new_etc_passwd"
+    pfl2 = sambacc.passwd_loader.PasswdFileLoader(fname2)
+    pfl2.lines.append("root:x:0:0:root:/root:/bin/bash\n")
+    pfl2.write()
+    assert os.stat(fname2).st_mode & 0o777 == 0o644
+    with open(fname2) as fh:
+        assert fh.read() == "root:x:0:0:root:/root:/bin/bash\n"
+
+
+def test_write_passwd_file_short_write(tmp_path, monkeypatch):
+    fname = tmp_path / "short_etc_passwd"
+    with open(fname, "w") as fh:
+        fh.write(etc_passwd1)
+    pfl = sambacc.passwd_loader.PasswdFileLoader(fname)
+    pfl.read()
+    pfl.lines.append("extra:x:9999:9999::/:/bin/false\n")
+
+    real_write = os.write
+    calls = []
+
+    def short_write(fd, data):
+        # write only part of the data, then fail like a full disk would
+        calls.append(len(data))
+        if len(calls) > 1:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return real_write(fd, data[: len(data) // 2])
+
+    monkeypatch.setattr(os, "write", short_write)
+    with pytest.raises(OSError):
+        pfl.write()
+    monkeypatch.undo()
+
+    assert len(calls) == 2
+    with open(fname) as fh:
+        assert fh.read() == etc_passwd1
+    assert os.listdir(tmp_path) == ["short_etc_passwd"]
+
+
+def test_write_passwd_file_replace_fails(tmp_path, monkeypatch):
+    fname = tmp_path / "replace_etc_passwd"
+    with open(fname, "w") as fh:
+        fh.write(etc_passwd1)
+    pfl = sambacc.passwd_loader.PasswdFileLoader(fname)
+    pfl.read()
+
+    def bad_replace(src, dst):
+        raise OSError(errno.EBUSY, "busy")
+
+    monkeypatch.setattr(os, "replace", bad_replace)
+    with pytest.raises(OSError):
+        pfl.write()
+    monkeypatch.undo()
+    assert os.listdir(tmp_path) == ["replace_etc_passwd"]
@@ -49,3 +49,16 @@ def test_ensure_samba_dirs_already(tmp_path):
     os.mkdir(tmp_path / "run/samba/")
     os.mkdir(tmp_path / "run/samba/winbindd")
     sambacc.paths.ensure_samba_dirs(root=tmp_path)
+
+
+def test_ensure_samba_dirs_repeated(tmp_path):
+    os.mkdir(tmp_path / "var")
+    os.mkdir(tmp_path / "var/lib")
+    os.mkdir(tmp_path / "run")
+    sambacc.paths.ensure_samba_dirs(root=tmp_path)
+    assert tmp_path in sambacc.paths._ENSURED_ROOTS
+    sambacc.paths.ensure_samba_dirs(root=tmp_path)
+    # dirs removed behind our back are created again
+    os.rmdir(tmp_path / "run/samba/winbindd")
+    sambacc.paths.ensure_samba_dirs(root=tmp_path)
+    assert os.path.isdir(tmp_path / "run/samba/winbindd")